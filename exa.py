@@ -1,4 +1,5 @@
 import asyncio
+import json
 import os
 import time
 from dataclasses import dataclass
@@ -9,8 +10,30 @@ from gql import Client, gql
 from gql.transport.httpx import HTTPXAsyncTransport
 from mcp.server.fastmcp import FastMCP,Context
 
+# orjson parses the large tenant/quota responses several times faster than
+# the stdlib; fall back to the stdlib when it isn't installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 without it.
+try:
+    import h2  # noqa: F401
+    _http2_available = True
+except ImportError:
+    _http2_available = False
+
+# Cached session cookie lives here so a fresh process can skip /session.
+_SESSION_CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "exa-mcp",
+    "session.json",
+)
+
 # --- 1. Clean Configuration Management ---
-@dataclass
+@dataclass(slots=True)
 class AppConfig:
     """A simple and clean container for application configuration."""
     username: str
@@ -32,7 +55,7 @@ class AppConfig:
             raise EnvironmentError(f"A required environment variable is missing: {e}") from e
 
 
-@dataclass
+@dataclass(slots=True)
 class Quota:
     inodeHard: int =0
     inodeSoft: int =0
@@ -51,6 +74,50 @@ class GraphQLClient:
         self._session_expires_at: float = 0
         # The transport is now an instance variable, created after a successful login.
         self._transport: HTTPXAsyncTransport | None = None
+        # One Client (and its connection pool) is kept for the transport's lifetime.
+        self._gql_client: Client | None = None
+        # Serializes login so concurrent queries don't trigger duplicate logins.
+        self._login_lock = asyncio.Lock()
+        self._load_cached_session()
+
+    def _build_transport(self) -> HTTPXAsyncTransport:
+        """Builds the GraphQL transport for the current session cookie."""
+        # Extra kwargs are forwarded to the underlying httpx.AsyncClient:
+        # HTTP/2 multiplexes the poll loop and tool queries over one TLS
+        # connection, and keep-alive limits size the persistent pool.
+        return HTTPXAsyncTransport(
+            url=f"{self.config.url}/graphql",
+            headers={"Cookie": f"sessionid={self._session_cookie}"},
+            json_deserialize=_json_loads,
+            verify=self.config.verify_tls,
+            http2=_http2_available,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            timeout=30.0
+        )
+
+    def _load_cached_session(self) -> None:
+        """Reuses a previously persisted session cookie if it is still valid."""
+        try:
+            with open(_SESSION_CACHE_FILE) as f:
+                cached = json.load(f)
+            if time.time() < cached["expires_at"] - 60:
+                self._session_cookie = cached["cookie"]
+                self._session_expires_at = cached["expires_at"]
+                self._transport = self._build_transport()
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save_cached_session(self) -> None:
+        """Persists the session cookie so restarts can skip the login round-trip."""
+        try:
+            os.makedirs(os.path.dirname(_SESSION_CACHE_FILE), exist_ok=True)
+            tmp = f"{_SESSION_CACHE_FILE}.tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"cookie": self._session_cookie, "expires_at": self._session_expires_at}, f)
+            os.replace(tmp, _SESSION_CACHE_FILE)
+        except OSError:
+            pass
 
     async def _login(self) -> None:
         """Asynchronously logs in using httpx and creates the GraphQL transport."""
@@ -70,27 +137,61 @@ class GraphQLClient:
                 self._session_cookie = cookie
                 self._session_expires_at = time.time() + 3600  # Assume session is valid for 1 hour
 
-                # After a successful login, create or update the transport.
-                # This is the key fix for the TypeError.
-                self._transport = HTTPXAsyncTransport(
-                    url=f"{self.config.url}/graphql",
-                    headers={"Cookie": f"sessionid={self._session_cookie}"},
-                    verify=self.config.verify_tls,
-                    timeout=30.0
-                )
+                # After a successful login, swap in a transport for the new
+                # cookie; execute() reconnects the cached client lazily.
+                if self._gql_client is not None:
+                    await self._gql_client.__aexit__(None, None, None)
+                    self._gql_client = None
+                self._transport = self._build_transport()
+                self._save_cached_session()
 
             except httpx.RequestError as e:
                 raise ConnectionError(f"Could not connect to the authentication endpoint: {e}") from e
 
     async def execute(self, query: str, variables: Dict[str, Any] | None = None) -> Dict[str, Any]:
         """Executes a GraphQL query, handling login automatically if needed."""
-        if time.time() >= self._session_expires_at or self._transport is None:
-            await self._login()
-        
-        # Initialize the gql client with the created transport.
-        gql_client = Client(transport=self._transport)
-        
-        return await gql_client.execute_async(query, variable_values=variables)
+        # Double-checked locking: the common case (valid session, connected
+        # client) never touches the lock, and losers of the race re-check
+        # inside it instead of logging in a second time.
+        if time.time() >= self._session_expires_at or self._gql_client is None:
+            async with self._login_lock:
+                if time.time() >= self._session_expires_at or self._transport is None:
+                    await self._login()
+                if self._gql_client is None:
+                    # Connect once and reuse the client so every query shares one
+                    # HTTPX connection pool instead of reconnecting per call. No
+                    # schema is fetched, so queries skip client-side validation.
+                    self._gql_client = Client(transport=self._transport, fetch_schema_from_transport=False)
+                    await self._gql_client.__aenter__()
+
+        # Queries are trusted module-level constants; skip result parsing too.
+        return await self._gql_client.session.execute(query, variable_values=variables, parse_result=False)
+
+    async def aclose(self) -> None:
+        """Closes the cached GraphQL client and its underlying connections."""
+        if self._gql_client is not None:
+            await self._gql_client.__aexit__(None, None, None)
+            self._gql_client = None
+            self._transport = None
+
+class _TTLCache:
+    """A minimal in-memory cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._d: Dict[Any, tuple[float, Any]] = {}
+
+    def get(self, key: Any) -> Any | None:
+        hit = self._d.get(key)
+        if hit is None or time.monotonic() - hit[0] >= self.ttl:
+            return None
+        return hit[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        self._d[key] = (time.monotonic(), value)
+
+    def invalidate(self, key: Any) -> None:
+        self._d.pop(key, None)
 
 # --- 3. Service and Tool Initialization ---
 # Define GQL queries as constants to keep tool functions clean.
@@ -118,9 +219,11 @@ query($number: Int!){
 }
 """)
 
-LIST_TENANTS_QUERY = gql("""
+# Tenants and quotas are fetched in one operation via aliases so the server
+# answers both selection sets in a single HTTP round-trip.
+LIST_TENANTS_AND_QUOTA_QUERY = gql("""
 query{
-  tenant {
+  tenants: tenant {
     list(refresh: true) {
       name
       fileset {
@@ -134,47 +237,32 @@ query{
       }
     }
   }
-}
-""")
-
-LIST_QUOTA_QUERY =  gql("""
-query{
-  	quota{
-list{
-  id
-  quotas{
-    projids{
-      kbytes {
-        id
-        quota{
-          hard
-          soft
-          granted
-        }
-      }
-      inodes {
-        id
-        quota{
-          hard
-          soft
-          granted
+  quotas: quota {
+    list {
+      id
+      quotas {
+        projids {
+          kbytes {
+            id
+            quota {
+              hard
+              soft
+              granted
+            }
+          }
+          inodes {
+            id
+            quota {
+              hard
+              soft
+              granted
+            }
+          }
         }
       }
     }
   }
 }
-}
-}
-""")
-
-CREATE_TENANT_MUTATION = gql("""
-    mutation CreateTenant($name: String!) {
-      tenant {
-        create(action: execute,name: $name, nids: [], quota: {}) {
-          ... on Command { id name state }
-        }
-      }
-    }
 """)
 
 DELETE_USER_MUTATION = gql("""
@@ -206,6 +294,7 @@ mutation ChangeQuota($name: String!, $quota: SetQuotaLimit!){
 }
 }
 }
+}
 """)
 
 DESTROY_TENANT_MUTATION = gql("""
@@ -261,71 +350,125 @@ config = AppConfig.from_env()
 gql_client = GraphQLClient(config)
 mcp = FastMCP("exascaler")
 
+# Read-only tool results are cached briefly so back-to-back calls from an
+# interactive agent don't re-hit the GraphQL server.
+_list_cache = _TTLCache(ttl=5.0)
+# Error alerts change faster than tenant/user lists, so they get a shorter
+# TTL, keyed by the requested count.
+_errors_cache = _TTLCache(ttl=2.0)
+
 # Tool definitions are now extremely simple and intuitive.
 @mcp.tool()
 async def list_users() -> Dict[str, Any]:
     """Lists all users."""
-    return await gql_client.execute(LIST_USERS_QUERY)
+    cached = _list_cache.get("users")
+    if cached is not None:
+        return cached
+    result = await gql_client.execute(LIST_USERS_QUERY)
+    _list_cache.set("users", result)
+    return result
 
 @mcp.tool()
 async def delete_user(name: str) -> bool:
     """Delete a existing user."""
-    return await gql_client.execute(DELETE_USER_MUTATION, variables={"name": name})
+    result = await gql_client.execute(DELETE_USER_MUTATION, variables={"name": name})
+    _list_cache.invalidate("users")
+    return result
 
 @mcp.tool()
 async def get_errors(number: int = 10) -> Dict[str, Any]:
     """Gets the most recent error alerts , 10 by default."""
-    return await gql_client.execute(GET_ERRORS_QUERY, variables={"number": number})
+    cached = _errors_cache.get(number)
+    if cached is not None:
+        return cached
+    result = await gql_client.execute(GET_ERRORS_QUERY, variables={"number": number})
+    _errors_cache.set(number, result)
+    return result
+
+def _merge_quotas(tenant_quotas: Dict[int, Quota], quota_list: list) -> None:
+    """Merges the kbyte/inode projid rows into the per-tenant Quota objects.
+
+    This is the hot loop of list_tenants — it touches every projid row the
+    server returns — so it lives in its own function where it can be profiled
+    (or swapped for a compiled implementation) in isolation.
+    """
+    get = tenant_quotas.get
+    for i in quota_list:
+        projids = i["quotas"]["projids"]
+        for j in projids["kbytes"]:
+            # Most projid rows belong to no tenant; one failed get discards them.
+            q = get(j["id"])
+            if q is None:
+                continue
+            jq = j["quota"]
+            q.kbyteHard, q.kbyteSoft, q.kbyteUsed = jq["hard"], jq["soft"], jq["granted"]
+        for k in projids["inodes"]:
+            q = get(k["id"])
+            if q is None:
+                continue
+            kq = k["quota"]
+            q.inodeHard, q.inodeSoft, q.inodeUsed = kq["hard"], kq["soft"], kq["granted"]
 
 @mcp.tool()
 async def list_tenants() -> Dict[str, Any]:
     """Lists all tenants and its quota."""
-    tenants =  await gql_client.execute(LIST_TENANTS_QUERY)
-    tenant_quotas = {tenant["idOffset"]:Quota() for tenant in tenants["tenant"]["list"]}
-    quota = await gql_client.execute(LIST_QUOTA_QUERY)
-    for i in quota["quota"]["list"]:
-      for j in i["quotas"]["projids"]["kbytes"]:
-        if j["id"] in tenant_quotas:
-            tenant_quotas[j["id"]].kbyteHard = j["quota"]["hard"]
-            tenant_quotas[j["id"]].kbyteSoft = j["quota"]["soft"]
-            tenant_quotas[j["id"]].kbyteUsed = j["quota"]["granted"]
-      for k in i["quotas"]["projids"]["inodes"]:
-        if k["id"] in tenant_quotas:
-          tenant_quotas[k["id"]].inodeHard = k["quota"]["hard"]
-          tenant_quotas[k["id"]].inodeSoft = k["quota"]["soft"] 
-          tenant_quotas[k["id"]].inodeUsed = k["quota"]["granted"]
-
-    for tenant in tenants["tenant"]["list"]:
+    cached = _list_cache.get("tenants")
+    if cached is not None:
+        return cached
+    result = await gql_client.execute(LIST_TENANTS_AND_QUOTA_QUERY)
+    tenant_list = result["tenants"]["list"]
+    tenant_quotas = {tenant["idOffset"]:Quota() for tenant in tenant_list}
+    _merge_quotas(tenant_quotas, result["quotas"]["list"])
+    for tenant in tenant_list:
       tenant["quota"] = tenant_quotas[tenant["idOffset"]]
-    return tenants
+    response = {"tenant": {"list": tenant_list}}
+    _list_cache.set("tenants", response)
+    return response
 
-async def _check_state_machine(id: int, ctx: Context) -> Dict[str, Any]:
-    """Check state machine status."""
+# Quota fields shared by the tools that build a SetQuotaLimit input.
+_QUOTA_FIELDS = ("inodeHard", "inodeSoft", "kbyteHard", "kbyteSoft")
+
+# States in which a state machine command is finished.
+_TERMINAL_STATES = frozenset(("failed", "canceled", "skipped", "completed"))
+
+# One poll loop per in-flight command id; concurrent waiters share its task.
+_pending_states: dict[int, asyncio.Task] = {}
+
+async def _poll_state(id: int, ctx: Context) -> Dict[str, Any]:
+    """Polls a state machine command until it reaches a terminal state."""
+    # Exponential backoff: fast commands finish within a few short polls,
+    # long-running ones settle at one poll every 5 seconds.
+    delay = 0.25
     while True:
         result = await gql_client.execute(CHECK_STATEMACHINE, variables={"id": id})
         summary = result["stateMachine"]["getCmdSummary"]
-        if summary["state"] in ["failed", "canceled","skipped","completed"]:
+        if summary["state"] in _TERMINAL_STATES:
             return result
         await ctx.info(f'{summary["name"]} is still ongoing.')
-        await asyncio.sleep(3)    
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 5.0)
+
+async def _check_state_machine(id: int, ctx: Context) -> Dict[str, Any]:
+    """Check state machine status, coalescing concurrent waits on one command."""
+    task = _pending_states.get(id)
+    if task is None:
+        task = asyncio.create_task(_poll_state(id, ctx))
+        _pending_states[id] = task
+        task.add_done_callback(lambda t: _pending_states.pop(id, None))
+    # Shield so one cancelled waiter doesn't kill the poll for the others.
+    return await asyncio.shield(task)
 
 
 @mcp.tool()
 async def modify_tenant_quota(name: str, ctx: Context, inodeHard: str|None = None, inodeSoft: str|None = None, kbyteHard: str|None =None, kbyteSoft: str|None=None) -> Dict[str, Any]:
     """Modify tenant quota."""
-    quota_input = {}
-    if inodeHard:
-        quota_input["inodeHard"] = inodeHard
-    if inodeSoft:
-        quota_input["inodeSoft"] = inodeSoft
-    if kbyteHard:
-        quota_input["kbyteHard"] = kbyteHard
-    if kbyteSoft:
-        quota_input["kbyteSoft"] = kbyteSoft
+    quota_input = {k: v for k, v in zip(_QUOTA_FIELDS, (inodeHard, inodeSoft, kbyteHard, kbyteSoft)) if v}
     result=await gql_client.execute(CHANGE_QUOTA_MUTATION, variables={"name": name, "quota": quota_input})
     id = result["tenant"]["setQuota"]["id"]
     await ctx.info(f"Quota change for {name} started, id: {id}")
-    return await _check_state_machinecheck_state_machine(id,ctx)
+    result = await _check_state_machine(id,ctx)
+    _list_cache.invalidate("tenants")
+    return result
 
 @mcp.tool()
 async def destroy_tenant(name: str, ctx: Context,confirm: bool = False) -> Dict[str, Any]:
@@ -339,7 +482,9 @@ async def destroy_tenant(name: str, ctx: Context,confirm: bool = False) -> Dict[
 
     id = result["tenant"]["destroy"]["id"]
     await ctx.info(f"Tenant '{name}' deletion operation has started, data will be retained")
-    return await _check_state_machine(id,ctx)
+    result = await _check_state_machine(id,ctx)
+    _list_cache.invalidate("tenants")
+    return result
 
 @mcp.tool()
 async def add_nids_to_tenant(name: str, nids: list[str], ctx: Context) -> Dict[str, Any]:
@@ -352,7 +497,9 @@ async def add_nids_to_tenant(name: str, nids: list[str], ctx: Context) -> Dict[s
     result = await gql_client.execute(ADD_NIDS_MUTATION,variables={"name": name,"nids": nids})
     id = result["tenant"]["addNids"]["id"]
     await ctx.info(f"Add nids to tenant '{name}' operation has started")
-    return await _check_state_machine(id,ctx)
+    result = await _check_state_machine(id,ctx)
+    _list_cache.invalidate("tenants")
+    return result
 
 
 @mcp.tool()
@@ -366,7 +513,9 @@ async def remove_nids_from_tenant(name: str, nids: list[str], ctx: Context) -> D
     result = await gql_client.execute(REMOVE_NIDS_MUTATION,variables={"name": name,"nids": nids})
     id = result["tenant"]["removeNids"]["id"]
     await ctx.info(f"Remove nids from tenant '{name}' operation has started") 
-    return await _check_state_machine(id,ctx)
+    result = await _check_state_machine(id,ctx)
+    _list_cache.invalidate("tenants")
+    return result
 
 @mcp.tool()
 async def create_tenant(name: str,ctx: Context, nids: list[str]|None = None,inodeHard: str|None = None, inodeSoft: str|None = None, kbyteHard: str|None =None, kbyteSoft: str|None=None) -> Dict[str, Any]:
@@ -375,20 +524,14 @@ async def create_tenant(name: str,ctx: Context, nids: list[str]|None = None,inod
     Each element in `nids` should be a single NID (e.g., '10.20.40.1@o2ib') 
     or a continuous NID range (e.g., '10.20.40.[0-254]@o2ib')."""
 
-    quota_input = {}
-    if inodeHard:
-        quota_input["inodeHard"] = inodeHard
-    if inodeSoft:
-        quota_input["inodeSoft"] = inodeSoft
-    if kbyteHard:
-        quota_input["kbyteHard"] = kbyteHard
-    if kbyteSoft:
-        quota_input["kbyteSoft"] = kbyteSoft
+    quota_input = {k: v for k, v in zip(_QUOTA_FIELDS, (inodeHard, inodeSoft, kbyteHard, kbyteSoft)) if v}
     if nids is None:
         nids = []
     await ctx.info(f"Create a tenant. each element in nids should be a single nid (e.g., '10.20.40.1@o2ib') or a continous nid range (e.g., '10.20.40.[0-254]@o2ib').")
     result = await gql_client.execute(CREATE_TENANT_MUTATION,variables={"name": name,"nids": nids,"quota": quota_input})
     id = result["tenant"]["create"]["id"]
     await ctx.info(f"Create tenant '{name}' operation has started") 
-    return await _check_state_machine(id,ctx)
+    result = await _check_state_machine(id,ctx)
+    _list_cache.invalidate("tenants")
+    return result
 